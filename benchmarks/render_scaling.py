@@ -0,0 +1,223 @@
+"""Scaling stress check for the renderers.
+
+Grows one input dimension at a time (tools, phases, process text, field length)
+with Unicode- and HTML-heavy data, measures render time and peak allocations
+above a zero-size baseline, and fails if their log-log slope is clearly above
+linear. Text grows to 1 MB per value (fields to 256 KB across eleven values) so
+per-character cost dominates; a
+deliberately quadratic renderer is run through the same check to prove it can
+fail. Also checks that the example
+templates, which reproduce the built-in layouts, render byte-identically to
+render_markdown/render_html (for every HTML theme) whether freshly compiled,
+loaded from the disk cache or served from memory, and that they render about
+as fast as the built-in renderers.
+
+    python benchmarks/render_scaling.py
+"""
+from __future__ import annotations
+
+import html
+import math
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from dataclasses import asdict  # noqa: E402
+
+from ai_disclaimer import templates  # noqa: E402
+from ai_disclaimer.config import load_config  # noqa: E402
+from ai_disclaimer.render import render_html, render_markdown  # noqa: E402
+
+# Smallest size per dimension; each is measured at 1x, 2x, 4x and 8x of it.
+# Text feeds three values and a field eleven, so both top out at a few MB of
+# rendered text, where per-character cost dominates.
+BASE = {"tools": 1000, "phases": 1000, "text": 128_000, "field": 32_000}
+STEPS = (1, 2, 4, 8)
+REPEATS = 5
+# Log-log slope of cost above the zero-size baseline: linear is 1, quadratic 2.
+# Linear renderers measure 1.0-1.4 here (cache and allocator effects on MB-sized
+# strings); the injected quadratic one measures above 2.
+MAX_SLOPE = 1.6
+
+# Templates pay a small fixed cost for building their context, which shows on
+# tiny inputs; at fleet-sized inputs they should match the built-in renderers.
+MAX_SLOWDOWN_SMALL = 1.75
+MAX_SLOWDOWN_LARGE = 1.25
+
+_CHUNK = "Ünïcødé 🤖 <b>&amp;</b> \"quoted\" 'single' — 漢字 "
+
+_TEMPLATES = Path(__file__).resolve().parent.parent / "examples" / "templates"
+MARKDOWN_TEMPLATE = (_TEMPLATES / "disclaimer.md.tmpl").read_text(encoding="utf-8")
+HTML_TEMPLATE = (_TEMPLATES / "disclaimer.html.tmpl").read_text(encoding="utf-8")
+
+
+def _text(n: int) -> str:
+    return (_CHUNK * (n // len(_CHUNK) + 1))[:n]
+
+
+def make_inputs(tools: int = 3, phases: int = 5, text: int = 200, field: int = 20) -> tuple:
+    project = {"name": _text(field), "policy_url": "https://example.com/?a=1&b=<2>", "date": "2026-01-01"}
+    tool_list = [
+        {"name": f"{_text(field)} {i}", "model": _text(field) if i % 2 else "", "mode": "Agentic"}
+        for i in range(tools)
+    ]
+    phase_list = []
+    for i in range(phases):
+        if i % 5 == 4:
+            phase_list.append({"name": _text(field), "preset": "Not started", "human": None, "ai": None})
+        else:
+            human = (i * 17) % 101
+            phase_list.append({"name": _text(field), "preset": "Custom", "human": human, "ai": 100 - human})
+    oversight = {"label": _text(field), "description": _text(text)}
+    return project, tool_list, phase_list, oversight, _text(text), _text(text)
+
+
+def _render_paths() -> dict:
+    return {
+        "markdown": lambda *a: render_markdown(*a),
+        "html": lambda *a: render_html(*a),
+        "template-markdown": lambda *a: templates.render_template(MARKDOWN_TEMPLATE, *a),
+        "template-html": lambda *a: templates.render_template(HTML_TEMPLATE, *a, autoescape=True),
+    }
+
+
+def _render_fresh(source: str, args: tuple, autoescape: bool, theme: str) -> str:
+    fn = templates.compile_template(source, use_cache=False)
+    return fn(templates.template_context(*args, theme=theme), html.escape if autoescape else str)
+
+
+def _measure(fn, args: tuple) -> tuple[float, int]:
+    fn(*args)  # warm-up
+    best = float("inf")
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        fn(*args)
+        best = min(best, time.perf_counter() - start)
+    tracemalloc.start()
+    fn(*args)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best, peak
+
+
+def _slope(sizes: list[int], costs: list[float], baseline: float) -> float:
+    """Least-squares slope of log(cost - baseline) against log(size)."""
+    xs = [math.log(n) for n in sizes]
+    ys = [math.log(max(c - baseline, 1e-12)) for c in costs]
+    mx, my = sum(xs) / len(xs), sum(ys) / len(ys)
+    return sum((x - mx) * (y - my) for x, y in zip(xs, ys)) / sum((x - mx) ** 2 for x in xs)
+
+
+def _quadratic_markdown(project, tools, phases, oversight, process, accountability, theme="auto"):
+    # Self-test renderer: re-slices the process text once per 4 KB chunk, O(n²).
+    copied = 0
+    for i in range(0, len(process), 4096):
+        copied += len(process[:i])
+    return render_markdown(project, tools, phases, oversight, process, accountability)
+
+
+def check_scaling(paths: dict, dims: tuple[str, ...] = tuple(BASE), quiet: bool = False) -> list[str]:
+    failures = []
+    for dim in dims:
+        sizes = [BASE[dim] * step for step in STEPS]
+        for name, fn in paths.items():
+            t0, m0 = _measure(fn, make_inputs(**{dim: 0}))
+            times, peaks = [], []
+            for n in sizes:
+                t, peak = _measure(fn, make_inputs(**{dim: n}))
+                times.append(t)
+                peaks.append(peak)
+            t_slope = _slope(sizes, times, t0)
+            m_slope = _slope(sizes, peaks, m0)
+            ok = t_slope <= MAX_SLOPE and m_slope <= MAX_SLOPE
+            if not quiet:
+                print(f"{dim:<7} {name:<17} time slope {t_slope:5.2f}  alloc slope {m_slope:5.2f}  {'ok' if ok else 'FAIL'}")
+            if not ok:
+                failures.append(f"{dim}/{name}: time slope {t_slope:.2f}, alloc slope {m_slope:.2f}")
+    return failures
+
+
+def check_self_test() -> list[str]:
+    failures = check_scaling({"quadratic": _quadratic_markdown}, dims=("text",), quiet=True)
+    ok = bool(failures)
+    print(f"self-test: injected O(n^2) renderer {'detected' if ok else 'NOT detected'}  {'ok' if ok else 'FAIL'}")
+    return [] if ok else ["self-test: scaling check missed an injected O(n^2) renderer"]
+
+
+def check_identical() -> list[str]:
+    failures = []
+    args = make_inputs(tools=200, phases=200, text=5000, field=100)
+    cases = [("markdown", "auto", render_markdown(*args), MARKDOWN_TEMPLATE, False)]
+    cases += [("html", theme, render_html(*args, theme=theme), HTML_TEMPLATE, True) for theme in ("auto", "light", "dark")]
+    for name, theme, expected, source, autoescape in cases:
+        kwargs = {"theme": theme, "autoescape": autoescape}
+        outputs = {"fresh": _render_fresh(source, args, autoescape, theme)}
+        templates.clear_cache()
+        outputs["compiled"] = templates.render_template(source, *args, **kwargs)
+        templates.clear_cache()
+        outputs["disk-cache"] = templates.render_template(source, *args, **kwargs)
+        outputs["memory-cache"] = templates.render_template(source, *args, **kwargs)
+        for path, out in outputs.items():
+            ok = out == expected
+            print(f"{name:<9} {theme:<5} template ({path}) vs render_{name}: {'ok' if ok else 'FAIL'}")
+            if not ok:
+                failures.append(f"{name}/{theme}: {path} template output differs from render_{name}")
+    return failures
+
+
+def _compare(builtin, template, number: int, repeat: int = 30) -> float:
+    """Ratio of template to built-in render time, interleaved to cancel out machine noise."""
+    best_builtin = best_template = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            builtin()
+        best_builtin = min(best_builtin, time.perf_counter() - start)
+        start = time.perf_counter()
+        for _ in range(number):
+            template()
+        best_template = min(best_template, time.perf_counter() - start)
+    return best_template / best_builtin
+
+
+def check_speed() -> list[str]:
+    failures = []
+    cfg = load_config(Path(__file__).resolve().parent.parent / ".ai-disclaimer.json")
+    repo_args = (
+        asdict(cfg.project), [asdict(t) for t in cfg.tools], [asdict(p) for p in cfg.phases],
+        asdict(cfg.oversight), cfg.process, cfg.accountability,
+    )
+    sizes = (
+        ("repo", repo_args, 500, MAX_SLOWDOWN_SMALL),
+        ("fleet", make_inputs(tools=50, phases=50, text=2000, field=30), 50, MAX_SLOWDOWN_LARGE),
+    )
+    for size, args, number, limit in sizes:
+        pairs = (
+            ("markdown", lambda: render_markdown(*args), lambda: templates.render_template(MARKDOWN_TEMPLATE, *args)),
+            ("html", lambda: render_html(*args), lambda: templates.render_template(HTML_TEMPLATE, *args, autoescape=True)),
+        )
+        for name, builtin, template in pairs:
+            ratio = _compare(builtin, template, number)
+            ok = ratio <= limit
+            print(f"speed {size:<5} template-{name:<8} x{ratio:5.2f} of render_{name} (limit x{limit})  {'ok' if ok else 'FAIL'}")
+            if not ok:
+                failures.append(f"speed {size}/{name}: template x{ratio:.2f} of built-in, limit x{limit}")
+    return failures
+
+
+def main() -> int:
+    with tempfile.TemporaryDirectory() as cache:
+        os.environ["AI_DISCLAIMER_CACHE_DIR"] = cache
+        failures = check_identical() + check_speed() + check_self_test() + check_scaling(_render_paths())
+    for failure in failures:
+        print(f"FAIL {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,11 +2,14 @@
 from __future__ import annotations
 
 import sys
+from contextlib import contextmanager
 from dataclasses import asdict
 from datetime import date
 from pathlib import Path
+from typing import Iterator
 
 from .config import CONFIG_FILENAME, DisclaimerConfig, OutputConfig, load_config, save_config
+from .fileio import LockTimeout, atomic_write_text, file_lock
 from .prompts import (
     collect_accountability,
     collect_output,
@@ -18,6 +21,7 @@ from .prompts import (
     confirm,
 )
 from .render import render_html, render_markdown
+from .templates import TemplateError, render_template
 
 
 def _write_output(cfg: DisclaimerConfig) -> None:
@@ -26,20 +30,41 @@ def _write_output(cfg: DisclaimerConfig) -> None:
     phases = [asdict(p) for p in cfg.phases]
     oversight = asdict(cfg.oversight)
 
-    if cfg.output.format == "Markdown":
+    if cfg.output.template:
+        try:
+            source = Path(cfg.output.template).read_text(encoding="utf-8")
+            content = render_template(
+                source, project, tools, phases, oversight, cfg.process, cfg.accountability,
+                theme=cfg.output.theme, autoescape=cfg.output.format == "HTML",
+            )
+        except (OSError, TemplateError) as exc:
+            print(f"  Could not render template {cfg.output.template}: {exc}")
+            sys.exit(1)
+    elif cfg.output.format == "Markdown":
         content = render_markdown(project, tools, phases, oversight, cfg.process, cfg.accountability)
     else:
         content = render_html(project, tools, phases, oversight, cfg.process, cfg.accountability, theme=cfg.output.theme)
 
     if cfg.output.filename:
-        with open(cfg.output.filename, "w", encoding="utf-8") as f:
-            f.write(content)
+        atomic_write_text(Path(cfg.output.filename), content)
         print(f"\n✓ Written to {cfg.output.filename}")
     else:
         print()
         print(content)
 
 
+@contextmanager
+def _config_lock(path: Path, shared: bool = False) -> Iterator[None]:
+    try:
+        with file_lock(path, shared=shared) as locked:
+            if not locked:
+                print(f"  Warning: could not create a lock file for {path}; continuing without a lock.")
+            yield
+    except LockTimeout as exc:
+        print(f"  Could not lock {path}: {exc}")
+        sys.exit(1)
+
+
 def main() -> None:
     print("╔══════════════════════════════════════════╗")
     print("║       AI Disclaimer Generator            ║")
@@ -50,13 +75,13 @@ def main() -> None:
     config_path = Path(CONFIG_FILENAME)
     if config_path.exists():
         if confirm(f"Found {CONFIG_FILENAME}. Regenerate using saved settings?", default=True):
-            cfg = load_config(config_path)
-            if cfg is None:
-                print(f"  Could not read {CONFIG_FILENAME}. Starting questionnaire.\n")
-            else:
-                cfg.project.date = date.today().isoformat()
-                _write_output(cfg)
-                return
+            with _config_lock(config_path, shared=True):
+                cfg = load_config(config_path)
+                if cfg is not None:
+                    cfg.project.date = date.today().isoformat()
+                    _write_output(cfg)
+                    return
+            print(f"  Could not read {CONFIG_FILENAME}. Starting questionnaire.\n")
 
     try:
         project = collect_project()
@@ -79,7 +104,8 @@ def main() -> None:
         "accountability": accountability,
         "output": output,
     })
-    save_config(cfg, config_path)
-    print(f"  Settings saved to {CONFIG_FILENAME}")
+    with _config_lock(config_path):
+        save_config(cfg, config_path)
+        print(f"  Settings saved to {CONFIG_FILENAME}")
 
-    _write_output(cfg)
+        _write_output(cfg)
@@ -5,6 +5,8 @@ import json
 from dataclasses import dataclass, asdict, field
 from pathlib import Path
 
+from .fileio import atomic_write_text
+
 CONFIG_FILENAME = ".ai-disclaimer.json"
 
 
@@ -41,6 +43,7 @@ class OutputConfig:
     format: str
     filename: str
     theme: str
+    template: str = ""
 
 
 @dataclass
@@ -69,7 +72,7 @@ class DisclaimerConfig:
 
 
 def save_config(cfg: DisclaimerConfig, path: Path = Path(CONFIG_FILENAME)) -> None:
-    path.write_text(json.dumps(asdict(cfg), indent=2), encoding="utf-8")
+    atomic_write_text(path, json.dumps(asdict(cfg), indent=2))
 
 
 def load_config(path: Path = Path(CONFIG_FILENAME)) -> DisclaimerConfig | None:
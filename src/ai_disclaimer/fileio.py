@@ -0,0 +1,142 @@
+"""Atomic file writes and per-file advisory locks, safe for parallel CI jobs."""
+from __future__ import annotations
+
+import os
+import secrets
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+LOCK_TIMEOUT = 10.0
+_POLL_INTERVAL = 0.01
+_MAX_POLL_INTERVAL = 0.2
+
+
+def cache_root() -> Path:
+    """Per-user cache directory; override with AI_DISCLAIMER_CACHE_DIR."""
+    override = os.environ.get("AI_DISCLAIMER_CACHE_DIR")
+    if override:
+        return Path(override)
+    base = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(base) / "ai-disclaimer"
+
+
+class LockTimeout(TimeoutError):
+    """Raised when a file lock cannot be acquired within the timeout."""
+
+
+def _fsync_dir(directory: Path) -> None:
+    # Persist the rename itself; not supported on every platform.
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def atomic_write_bytes(path: Path, data: bytes) -> None:
+    """Write data to path so readers see either the old or the new file, never a partial one.
+
+    Symlinks are followed: the link's target is replaced, not the link itself.
+    """
+    path = Path(os.path.realpath(path))
+    tmp = path.with_name(f".{path.name}.{secrets.token_hex(6)}.tmp")
+    # 0o666 lets the kernel apply the caller's umask to new files.
+    fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_EXCL | getattr(os, "O_BINARY", 0), 0o666)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            f.flush()
+            try:
+                os.chmod(tmp, os.stat(path).st_mode & 0o7777)
+            except FileNotFoundError:
+                pass
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+    _fsync_dir(path.parent)
+
+
+def atomic_write_text(path: Path, text: str, encoding: str = "utf-8") -> None:
+    atomic_write_bytes(path, text.encode(encoding))
+
+
+def _try_lock(fd: int, shared: bool) -> bool:
+    try:
+        if fcntl is not None:
+            fcntl.flock(fd, (fcntl.LOCK_SH if shared else fcntl.LOCK_EX) | fcntl.LOCK_NB)
+        else:
+            # msvcrt has no shared locks; readers take the exclusive one.
+            msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+    except OSError:
+        return False
+    return True
+
+
+def _unlock(fd: int) -> None:
+    if fcntl is not None:
+        fcntl.flock(fd, fcntl.LOCK_UN)
+    else:
+        os.lseek(fd, 0, os.SEEK_SET)
+        msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+
+
+def lock_path(path: Path) -> Path:
+    """Lock file for path: "<name>.lock" next to the real (symlink-resolved) target.
+
+    It sits beside the target, not in a per-user cache, so every job writing
+    the file sees the same lock whatever its HOME or cache settings.
+    """
+    real = Path(os.path.realpath(path))
+    return real.with_name(real.name + ".lock")
+
+
+@contextmanager
+def file_lock(path: Path, timeout: float = LOCK_TIMEOUT, shared: bool = False) -> Iterator[bool]:
+    """Hold an advisory lock on path for the duration of the block.
+
+    Each path has its own lock file, so unrelated writes never wait on each
+    other. Readers pass shared=True. Yields True when locked; if the lock file
+    cannot be created (e.g. a read-only checkout), the block runs unlocked and
+    yields False. Writes are atomic regardless. Not reentrant: do not nest
+    locks on the same path.
+    """
+    try:
+        lock = lock_path(path)
+        fd = os.open(lock, os.O_RDWR | os.O_CREAT, 0o644)
+    except (OSError, RuntimeError):
+        fd = None
+    if fd is None:
+        yield False
+        return
+    try:
+        deadline = time.monotonic() + timeout
+        delay = _POLL_INTERVAL
+        while not _try_lock(fd, shared):
+            if time.monotonic() >= deadline:
+                raise LockTimeout(f"timed out after {timeout:g}s waiting for {lock}")
+            time.sleep(delay)
+            delay = min(delay * 2, _MAX_POLL_INTERVAL)
+        try:
+            yield True
+        finally:
+            _unlock(fd)
+    finally:
+        os.close(fd)
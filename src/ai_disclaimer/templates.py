@@ -0,0 +1,405 @@
+"""User-defined disclaimer templates, compiled to Python code and cached on disk.
+
+Syntax (a small, dependency-free subset of Jinja):
+
+    {{ project.name }}                  output a value (HTML-escaped in HTML mode)
+    {{ t.model | upper }}               filters: lower, upper, escape, safe
+    {{ ph.name | ljust(25) }}           pad to a width: ljust(n), rjust(n)
+    {% for t in tools %}...{% endfor %}
+    {% if ph.na %}...{% elif x %}...{% else %}...{% endif %}
+    {% if not project.policy_url %}...{% endif %}
+    {# comment #}
+
+A line holding only a block tag or comment leaves no blank line behind.
+"""
+from __future__ import annotations
+
+import hashlib
+import html
+import importlib.util
+import json
+import marshal
+import re
+import sys
+from pathlib import Path
+from types import CodeType
+from typing import Callable
+
+from .fileio import atomic_write_bytes, cache_root
+from .render import _CSS, make_bars
+
+# Bump when the generated code changes shape so stale cache entries are ignored.
+_COMPILER_VERSION = "5"
+
+_TOKEN_RE = re.compile(r"(\{\{.*?\}\}|\{%.*?%\}|\{#.*?#\})", re.DOTALL)
+_PATH_RE = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*(\.[A-Za-z_][A-Za-z0-9_]*)*$")
+_FOR_RE = re.compile(r"^for\s+([A-Za-z_][A-Za-z0-9_]*)\s+in\s+(.+)$")
+_FILTER_RE = re.compile(r"^([a-z]+)(?:\(\s*(\d+)\s*\))?$")
+_OPENERS = ("{{", "{%", "{#")
+_MAX_WIDTH = 1000
+
+
+def _escape_html(value: object) -> str:
+    return html.escape(str(value))
+
+
+_FILTERS: dict[str, Callable[[object], object]] = {
+    "lower": lambda v: str(v).lower(),
+    "upper": lambda v: str(v).upper(),
+    "escape": _escape_html,
+}
+# Filters taking a width argument, e.g. {{ ph.name | ljust(25) }}.
+_WIDTH_FILTERS: dict[str, Callable[[object, int], str]] = {
+    "ljust": lambda v, n: str(v).ljust(n),
+    "rjust": lambda v, n: str(v).rjust(n),
+}
+
+_memory_cache: dict[str, Callable[..., str]] = {}
+# Percentages are 0-100, so every bar pair can be built once up front.
+_BARS = [make_bars(pct) for pct in range(101)]
+
+
+class TemplateError(ValueError):
+    """Raised for malformed templates or failed lookups while rendering."""
+
+
+def _is_tag(part: str) -> bool:
+    return part.startswith(("{%", "{#")) and part.endswith(("%}", "#}"))
+
+
+def _tokenize(source: str) -> list[tuple[str, str, int]]:
+    """Split source into (kind, content, line) tokens.
+
+    A block tag or comment alone on its line is removed together with its
+    indentation and line break.
+    """
+    parts = _TOKEN_RE.split(source)
+    lines = []
+    line = 1
+    for i, part in enumerate(parts):
+        if i % 2 == 0:
+            # Text between tags must not contain the start of an unterminated one.
+            found = [pos for pos in (part.find(o) for o in _OPENERS) if pos >= 0]
+            if found:
+                pos = min(found)
+                at = line + part.count("\n", 0, pos)
+                raise TemplateError(f"line {at}: unclosed tag {part[pos:pos + 2]!r}")
+        lines.append(line)
+        line += part.count("\n")
+
+    # The split alternates text, tag, text, ...: tags sit at odd indices.
+    # Decide on the original text first, then cut, so adjacent tags do not
+    # see each other's trimming.
+    last = len(parts) - 1
+    starts = [0] * len(parts)
+    ends = [len(part) for part in parts]
+    for i in range(1, len(parts), 2):
+        if not _is_tag(parts[i]):
+            continue
+        before, after = parts[i - 1], parts[i + 1]
+        _, nl, tail = before.rpartition("\n")
+        rest, nl_after, _ = after.partition("\n")
+        line_start = bool(nl) or i - 1 == 0
+        line_end = bool(nl_after) or i + 1 == last
+        if line_start and line_end and not tail.strip() and not rest.strip():
+            ends[i - 1] = len(before) - len(tail)
+            starts[i + 1] = len(rest) + len(nl_after)
+    parts = [part[start:max(start, end)] for part, start, end in zip(parts, starts, ends)]
+
+    tokens: list[tuple[str, str, int]] = []
+    for part, line in zip(parts, lines):
+        if not part:
+            continue
+        if part.startswith("{%") and part.endswith("%}"):
+            tokens.append(("block", part[2:-2].strip(), line))
+        elif part.startswith("{{") and part.endswith("}}"):
+            tokens.append(("expr", part[2:-2].strip(), line))
+        elif not (part.startswith("{#") and part.endswith("#}")):
+            tokens.append(("text", part, line))
+    return tokens
+
+
+class _Compiler:
+    def __init__(self) -> None:
+        self.lines: list[str] = [
+            "def _render(ctx, _escape):",
+            "    _out = []",
+            "    _w = _out.append",
+        ]
+        self.indent = 1
+        # Loop variables per nesting level, mapped to their Python local name.
+        self.scopes: list[dict[str, str]] = []
+        # Open blocks: [tag, line, else_seen] — tag is "if" or "for".
+        self.stack: list[list] = []
+        # Generated line number -> (template line, expression), for render errors.
+        self.origins: dict[int, tuple[int, str]] = {}
+
+    def emit(self, code: str, origin: tuple[int, str] | None = None) -> None:
+        self.lines.append("    " * self.indent + code)
+        if origin is not None:
+            self.origins[len(self.lines)] = origin
+
+    def path(self, expr: str, line: int) -> str:
+        if not _PATH_RE.match(expr):
+            raise TemplateError(f"line {line}: invalid expression {expr!r}")
+        head, *attrs = expr.split(".")
+        for scope in reversed(self.scopes):
+            if head in scope:
+                code = scope[head]
+                break
+        else:
+            code = f"ctx[{head!r}]"
+        return code + "".join(f"[{attr!r}]" for attr in attrs)
+
+    def condition(self, expr: str, line: int) -> str:
+        negate = False
+        if expr.startswith("not "):
+            negate, expr = True, expr[4:].strip()
+        code = self.path(expr, line)
+        return f"not {code}" if negate else code
+
+    def output(self, expr: str, line: int) -> str:
+        base, *filters = [p.strip() for p in expr.split("|")]
+        code = self.path(base, line)
+        escape = True
+        for spec in filters:
+            m = _FILTER_RE.match(spec)
+            name, width = m.groups() if m else (spec, None)
+            if name not in _FILTERS and name not in _WIDTH_FILTERS and name != "safe":
+                raise TemplateError(f"line {line}: unknown filter {spec!r}")
+            if name in _WIDTH_FILTERS:
+                if width is None:
+                    raise TemplateError(f"line {line}: filter {name!r} needs a width, e.g. {name}(10)")
+                if int(width) > _MAX_WIDTH:
+                    raise TemplateError(f"line {line}: width {width} exceeds the maximum of {_MAX_WIDTH}")
+                code = f"_WIDTH_FILTERS[{name!r}]({code}, {int(width)})"
+            elif width is not None:
+                raise TemplateError(f"line {line}: filter {name!r} takes no argument")
+            elif name == "safe":
+                escape = False
+            else:
+                code = f"_FILTERS[{name!r}]({code})"
+                if name == "escape":
+                    escape = False
+        # Values end up in an f-string, which formats non-strings itself.
+        if not escape:
+            return code
+        # Only strings need escaping; numbers and None skip the call.
+        return f"(_escape(_v) if (_v := {code}).__class__ is str else _v)"
+
+    def block(self, tag: str, line: int) -> None:
+        keyword = tag.split(None, 1)[0] if tag else ""
+        if keyword == "for":
+            m = _FOR_RE.match(tag)
+            if not m:
+                raise TemplateError(f"line {line}: malformed for tag {tag!r}")
+            var, seq = m.groups()
+            seq_code = self.path(seq.strip(), line)
+            local = f"l_{var}_{len(self.scopes)}"
+            self.emit(f"for {local} in {seq_code}:", (line, seq.strip()))
+            self.indent += 1
+            self.scopes.append({var: local})
+            self.stack.append(["for", line, False])
+        elif keyword == "if":
+            expr = tag[2:].strip()
+            self.emit(f"if {self.condition(expr, line)}:", (line, expr))
+            self.indent += 1
+            self.stack.append(["if", line, False])
+        elif keyword in ("elif", "else"):
+            if not self.stack or self.stack[-1][0] != "if":
+                raise TemplateError(f"line {line}: {keyword} outside of if block")
+            if self.stack[-1][2]:
+                raise TemplateError(f"line {line}: {keyword} after else")
+            self.emit("pass")
+            self.indent -= 1
+            if keyword == "elif":
+                expr = tag[4:].strip()
+                self.emit(f"elif {self.condition(expr, line)}:", (line, expr))
+            else:
+                self.emit("else:")
+                self.stack[-1][2] = True
+            self.indent += 1
+        elif keyword in ("endfor", "endif"):
+            opened = keyword[3:]
+            if not self.stack or self.stack[-1][0] != opened:
+                raise TemplateError(f"line {line}: unexpected {keyword}")
+            self.stack.pop()
+            if opened == "for":
+                self.scopes.pop()
+            self.emit("pass")
+            self.indent -= 1
+        else:
+            raise TemplateError(f"line {line}: unknown tag {tag!r}")
+
+    def flush(self, run: list[tuple[str, tuple[int, str] | None]]) -> None:
+        # A run of text and values becomes one f-string, split over implicitly
+        # concatenated lines so render errors still point at the right expression.
+        if run:
+            self.emit("_w(")
+            self.indent += 1
+            for code, origin in run:
+                self.emit(f'f"{{{code}}}"' if origin else code, origin)
+            self.indent -= 1
+            self.emit(")")
+        run.clear()
+
+    def compile(self, source: str) -> str:
+        run: list[tuple[str, tuple[int, str] | None]] = []
+        for kind, content, line in _tokenize(source):
+            if kind == "text":
+                # JSON string syntax is valid Python; braces are doubled for the f-string.
+                literal = json.dumps(content, ensure_ascii=False).replace("{", "{{").replace("}", "}}")
+                run.append((f"f{literal}", None))
+            elif kind == "expr":
+                run.append((self.output(content, line), (line, content)))
+            else:
+                self.flush(run)
+                self.block(content, line)
+        self.flush(run)
+        if self.stack:
+            tag, line, _ = self.stack[-1]
+            raise TemplateError(f"line {line}: unclosed {tag} block")
+        self.emit("return ''.join(_out)")
+        self.indent = 0
+        self.emit(f"_ORIGINS = {self.origins!r}")
+        return "\n".join(self.lines) + "\n"
+
+
+def cache_dir() -> Path:
+    """Directory holding compiled templates, under the shared cache root."""
+    return cache_root() / "templates"
+
+
+def _template_key(source: str) -> str:
+    # MAGIC_NUMBER changes with the bytecode format, like it does for .pyc files.
+    magic = importlib.util.MAGIC_NUMBER.hex()
+    return hashlib.sha256(f"{_COMPILER_VERSION}\0{magic}\0{source}".encode("utf-8")).hexdigest()
+
+
+def _load_code(path: Path) -> CodeType | None:
+    try:
+        code = marshal.loads(path.read_bytes())
+    except (OSError, EOFError, ValueError, TypeError):
+        return None
+    return code if isinstance(code, CodeType) else None
+
+
+def _store_code(path: Path, code: CodeType) -> None:
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        atomic_write_bytes(path, marshal.dumps(code))
+    except OSError:
+        pass  # The cache is an optimisation; rendering works without it.
+
+
+def compile_template(source: str, use_cache: bool = True) -> Callable[..., str]:
+    """Compile template source into a render function, reusing cached bytecode.
+
+    Compiled code objects are kept in memory and on disk under cache_dir(),
+    keyed by the SHA-256 of the template source and the interpreter's bytecode
+    magic number. Without a usable cache directory, templates are compiled in
+    memory only.
+    """
+    # Keyed by the source itself: str hashes are cached, SHA-256 is not.
+    if use_cache and source in _memory_cache:
+        return _memory_cache[source]
+
+    key = _template_key(source)
+
+    path = None
+    if use_cache:
+        try:
+            path = cache_dir() / f"{key}.{sys.implementation.cache_tag}.bin"
+        except (OSError, RuntimeError):
+            pass  # e.g. no resolvable home directory
+    code = _load_code(path) if path is not None else None
+    if code is None:
+        try:
+            code = compile(_Compiler().compile(source), f"<template {key[:12]}>", "exec")
+        except SyntaxError as exc:
+            raise TemplateError(f"could not compile template: {exc.msg}") from exc
+        if path is not None:
+            _store_code(path, code)
+
+    namespace: dict = {"_FILTERS": _FILTERS, "_WIDTH_FILTERS": _WIDTH_FILTERS}
+    exec(code, namespace)
+    fn = namespace["_render"]
+    if use_cache:
+        _memory_cache[source] = fn
+    return fn
+
+
+def clear_cache() -> None:
+    """Forget compiled templates held in memory; the on-disk cache is kept."""
+    _memory_cache.clear()
+
+
+def template_context(
+    project: dict,
+    tools: list[dict],
+    phases: list[dict],
+    oversight: dict,
+    process: str,
+    accountability: str,
+    theme: str = "auto",
+) -> dict:
+    """Data exposed to templates: the renderer inputs plus precomputed bars, theme attribute and CSS."""
+    phase_rows = []
+    for ph in phases:
+        row = ph.copy()
+        pct = ph["human"]
+        if pct is None:
+            row["na"], row["human_bar"], row["ai_bar"] = True, "", ""
+        else:
+            row["na"] = False
+            row["human_bar"], row["ai_bar"] = (
+                _BARS[pct] if pct.__class__ is int and 0 <= pct <= 100 else make_bars(pct)
+            )
+        phase_rows.append(row)
+    return {
+        "project": project,
+        "tools": tools,
+        "phases": phase_rows,
+        "oversight": oversight,
+        "process": process,
+        "accountability": accountability,
+        "theme": theme,
+        "theme_attr": f' data-theme="{theme}"' if theme in ("light", "dark") else "",
+        "css": _CSS,
+    }
+
+
+def render_template(
+    source: str,
+    project: dict,
+    tools: list[dict],
+    phases: list[dict],
+    oversight: dict,
+    process: str,
+    accountability: str,
+    theme: str = "auto",
+    autoescape: bool = False,
+) -> str:
+    fn = compile_template(source)
+    ctx = template_context(project, tools, phases, oversight, process, accountability, theme)
+    try:
+        return fn(ctx, html.escape if autoescape else str)
+    except (KeyError, IndexError, TypeError) as exc:
+        raise _render_error(fn, exc) from exc
+
+
+def _render_error(fn: Callable[..., str], exc: Exception) -> TemplateError:
+    """Map an exception raised inside a compiled template back to its template line."""
+    lineno = None
+    tb = exc.__traceback__
+    while tb is not None:
+        if tb.tb_frame.f_code is fn.__code__:
+            lineno = tb.tb_lineno
+        tb = tb.tb_next
+    origin = fn.__globals__.get("_ORIGINS", {}).get(lineno)
+    if origin is None:
+        return TemplateError(f"render failed: {exc!r}")
+    line, expr = origin
+    if isinstance(exc, KeyError):
+        return TemplateError(f"line {line}: undefined {expr!r}")
+    return TemplateError(f"line {line}: cannot evaluate {expr!r}: {exc}")
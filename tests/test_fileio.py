@@ -0,0 +1,111 @@
+import multiprocessing
+import os
+import stat
+import sys
+from pathlib import Path
+
+import pytest
+
+from ai_disclaimer.fileio import LockTimeout, atomic_write_text, file_lock, lock_path
+
+posix_only = pytest.mark.skipif(sys.platform == "win32", reason="POSIX file modes and flock")
+
+
+def test_atomic_write_replaces_content_and_leaves_no_temp_files(tmp_path):
+    target = tmp_path / "out.md"
+    target.write_text("old", encoding="utf-8")
+    atomic_write_text(target, "new ✓")
+    assert target.read_text(encoding="utf-8") == "new ✓"
+    assert [p.name for p in tmp_path.iterdir()] == ["out.md"]
+
+
+@posix_only
+def test_atomic_write_keeps_mode_of_existing_file(tmp_path):
+    target = tmp_path / "out.md"
+    target.write_text("old", encoding="utf-8")
+    target.chmod(0o640)
+    atomic_write_text(target, "new")
+    assert stat.S_IMODE(target.stat().st_mode) == 0o640
+
+
+@posix_only
+def test_atomic_write_applies_umask_to_new_files(tmp_path):
+    old = os.umask(0o027)
+    try:
+        atomic_write_text(tmp_path / "new.md", "x")
+    finally:
+        os.umask(old)
+    assert stat.S_IMODE((tmp_path / "new.md").stat().st_mode) == 0o640
+
+
+@posix_only
+def test_atomic_write_follows_symlinks(tmp_path):
+    real = tmp_path / "real.json"
+    real.write_text("old", encoding="utf-8")
+    link = tmp_path / "link.json"
+    link.symlink_to(real)
+    atomic_write_text(link, "new")
+    assert link.is_symlink()
+    assert real.read_text(encoding="utf-8") == "new"
+
+
+def test_lock_file_sits_next_to_target(tmp_path):
+    target = tmp_path / ".ai-disclaimer.json"
+    with file_lock(target) as locked:
+        assert locked
+    assert lock_path(target) == target.resolve().with_name(".ai-disclaimer.json.lock")
+    assert lock_path(target).exists()
+
+
+@posix_only
+def test_exclusive_lock_times_out(tmp_path):
+    target = tmp_path / "cfg.json"
+    with file_lock(target):
+        with pytest.raises(LockTimeout):
+            with file_lock(target, timeout=0.05):
+                pass
+
+
+@posix_only
+def test_shared_locks_coexist_but_block_writers(tmp_path):
+    target = tmp_path / "cfg.json"
+    with file_lock(target, shared=True):
+        with file_lock(target, timeout=0.05, shared=True) as locked:
+            assert locked
+        with pytest.raises(LockTimeout):
+            with file_lock(target, timeout=0.05):
+                pass
+
+
+def test_unlocked_fallback_when_lock_file_cannot_be_created(tmp_path):
+    target = tmp_path / "missing-dir" / "cfg.json"
+    with file_lock(target) as locked:
+        assert not locked
+
+
+def test_fallback_does_not_chain_caller_errors(tmp_path):
+    target = tmp_path / "missing-dir" / "cfg.json"
+    with pytest.raises(ValueError) as excinfo:
+        with file_lock(target):
+            raise ValueError("boom")
+    assert excinfo.value.__context__ is None
+
+
+def _increment(path: str, rounds: int) -> None:
+    target = Path(path)
+    for _ in range(rounds):
+        with file_lock(target):
+            value = int(target.read_text(encoding="utf-8"))
+            atomic_write_text(target, str(value + 1))
+
+
+@posix_only
+def test_concurrent_read_modify_write_loses_no_updates(tmp_path):
+    target = tmp_path / "counter"
+    target.write_text("0", encoding="utf-8")
+    procs = [multiprocessing.Process(target=_increment, args=(str(target), 25)) for _ in range(8)]
+    for p in procs:
+        p.start()
+    for p in procs:
+        p.join()
+    assert target.read_text(encoding="utf-8") == str(8 * 25)
@@ -0,0 +1,119 @@
+import re
+
+import pytest
+
+from ai_disclaimer import templates
+from ai_disclaimer.templates import TemplateError, compile_template, render_template
+
+
+@pytest.fixture(autouse=True)
+def _cache(tmp_path, monkeypatch):
+    monkeypatch.setenv("AI_DISCLAIMER_CACHE_DIR", str(tmp_path))
+    templates.clear_cache()
+    yield
+    templates.clear_cache()
+
+
+def render(source: str, **ctx) -> str:
+    return compile_template(source)(ctx, str)
+
+
+def render_full(source: str, **kwargs) -> str:
+    project = {"name": "Demo", "policy_url": "", "date": "2026-01-01"}
+    return render_template(source, project, [], [], {"label": "", "description": ""}, "", "", **kwargs)
+
+
+@pytest.mark.parametrize(
+    ("source", "message"),
+    [
+        ("{% if x %}", "line 1: unclosed if block"),
+        ("a\n{% for t in xs %}", "line 2: unclosed for block"),
+        ("{% endfor %}", "line 1: unexpected endfor"),
+        ("{% for t in xs %}{% endif %}", "line 1: unexpected endif"),
+        ("{% else %}", "line 1: else outside of if block"),
+        ("{% if x %}a{% else %}b{% else %}c{% endif %}", "line 1: else after else"),
+        ("{% if x %}{% else %}{% elif y %}{% endif %}", "line 1: elif after else"),
+        ("{% while x %}", "line 1: unknown tag 'while x'"),
+        ("{% for t xs %}", "line 1: malformed for tag"),
+        ("{{ a b }}", "line 1: invalid expression 'a b'"),
+        ("{{ a | nope }}", "line 1: unknown filter 'nope'"),
+        ("{{ a | ljust }}", "line 1: filter 'ljust' needs a width"),
+        ("{{ a | lower(3) }}", "line 1: filter 'lower' takes no argument"),
+        ("{{ a | ljust(99999999999) }}", "line 1: width 99999999999 exceeds the maximum"),
+        ("a\n\n{{ project.name }", "line 3: unclosed tag '{{'"),
+        ("{% if x }", "line 1: unclosed tag '{%'"),
+        ("x {# note", "line 1: unclosed tag '{#'"),
+    ],
+)
+def test_compile_errors(source, message):
+    with pytest.raises(TemplateError, match=re.escape(message)):
+        compile_template(source)
+
+
+def test_undefined_lookup_reports_line_and_path():
+    with pytest.raises(TemplateError, match=r"line 2: undefined 'project.nope'"):
+        render_full("a\n{{ project.nope }}")
+
+
+def test_undefined_lookup_in_loop():
+    with pytest.raises(TemplateError, match=r"line 2: undefined 'x.missing'"):
+        render_full("{% for x in tools %}\n{% endfor %}{{ x.missing }}")
+
+
+def test_nested_loops_keep_their_own_variable():
+    tools = [{"name": "A"}, {"name": "B"}]
+    source = "{% for t in tools %}[{{ t.name }}:{% for t in tools %}{{ t.name }}{% endfor %}:{{ t.name }}]{% endfor %}"
+    assert render(source, tools=tools) == "[A:AB:A][B:AB:B]"
+
+
+def test_if_elif_else():
+    source = "{% if a %}A{% elif b %}B{% else %}C{% endif %}"
+    assert render(source, a=1, b=1) == "A"
+    assert render(source, a=0, b=1) == "B"
+    assert render(source, a=0, b=0) == "C"
+    assert render("{% if not a %}N{% endif %}", a="") == "N"
+
+
+def test_standalone_tags_are_trimmed():
+    source = "  {% if x %}\n  y\n  {% endif %}\n{# note #}\nz"
+    assert render(source, x=1) == "  y\nz"
+
+
+def test_inline_tags_keep_whitespace():
+    assert render("a {% if x %}X{% endif %}\nb", x=1) == "a X\nb"
+    assert render("{% if x %}y{% endif %}", x=1) == "y"
+
+
+def test_filters():
+    assert render("[{{ a | ljust(5) }}|{{ b | rjust(3) }}|{{ a | upper }}]", a="x", b=7) == "[x    |  7|X]"
+
+
+def test_autoescape_and_safe():
+    source = "{{ project.name }}|{{ project.name | safe }}|{{ project.date }}"
+    project = {"name": "<b>&</b>", "policy_url": "", "date": 5}
+    out = render_template(source, project, [], [], {}, "", "", autoescape=True)
+    assert out == "&lt;b&gt;&amp;&lt;/b&gt;|<b>&</b>|5"
+
+
+@pytest.mark.parametrize(("theme", "attr"), [("auto", ""), ("light", ' data-theme="light"'), ("dark", ' data-theme="dark"')])
+def test_theme_attr(theme, attr):
+    assert render_full("{{ theme_attr | safe }}", theme=theme) == attr
+
+
+def test_disk_cache_is_reused(monkeypatch):
+    source = "{{ project.name }}"
+    assert render_full(source) == "Demo"
+    assert len(list(templates.cache_dir().glob("*.bin"))) == 1
+    templates.clear_cache()
+    monkeypatch.setattr(templates._Compiler, "compile", lambda self, source: pytest.fail("recompiled"))
+    assert render_full(source) == "Demo"
+
+
+def test_no_home_directory_compiles_in_memory(monkeypatch):
+    def no_home():
+        raise RuntimeError("Could not determine home directory")
+
+    monkeypatch.delenv("AI_DISCLAIMER_CACHE_DIR")
+    monkeypatch.delenv("XDG_CACHE_HOME", raising=False)
+    monkeypatch.setattr(templates.Path, "home", no_home)
+    assert render_full("{{ project.name }}") == "Demo"